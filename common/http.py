@@ -0,0 +1,111 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+import httpx
+from config import HTTP_TIMEOUT, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_CACHE_SIZE, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_TTL
+
+
+class Page(NamedTuple):
+    """A page downloaded by the Fetcher"""
+    status_code: int
+    text: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Function used to create the async http client used by the scrapers.
+    The client keeps a pool of keep-alive connections so that consecutive
+    requests to the same provider reuse the already opened connections.
+
+    Returns:
+        httpx.AsyncClient: The http client
+    """
+    limits = httpx.PoolLimits(max_keepalive=HTTP_MAX_KEEPALIVE, max_connections=HTTP_MAX_CONNECTIONS)
+    return httpx.AsyncClient(http2=True, pool_limits=limits, timeout=HTTP_TIMEOUT)
+
+
+class Fetcher:
+    """Http client used by the scrapers to download the pages of the providers.
+    The downloaded pages are kept for ttl seconds in a LRU cache bounded both in
+    number of pages and in memory, so a page requested many times is downloaded only once.
+    The cache is internal to the scraper: a search sent with Cache-Control: no-cache
+    may still be answered from a page downloaded up to ttl seconds before.
+    Once expired, a page with an ETag or a Last-Modified date is revalidated
+    with a conditional request, and downloaded again only if it changed.
+    """
+    def __init__(self, maxsize: int = HTTP_CACHE_SIZE, maxbytes: int = HTTP_CACHE_MAX_BYTES, ttl: float = HTTP_CACHE_TTL):
+        self._client = create_http_client()
+        self._cache: "OrderedDict[str, Tuple[float, Page]]" = OrderedDict()
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._bytes = 0
+        self._ttl = ttl
+
+    async def get(self, url: str) -> Page:
+        """Function used to download a page, or to take it from the cache if recently downloaded
+
+        Args:
+            url (str): The url of the page
+
+        Returns:
+            Page: The status code and the text of the page
+        """
+        headers: Dict[str, str] = {}
+        cached = self._cache.get(url)
+        if cached is not None:
+            created_at, page = cached
+            if time.monotonic() - created_at < self._ttl:
+                self._cache.move_to_end(url)
+                return page
+            if page.etag is not None:
+                headers["If-None-Match"] = page.etag
+            if page.last_modified is not None:
+                headers["If-Modified-Since"] = page.last_modified
+            if not headers:
+                self._discard(url)
+
+        res = await self._client.get(url, headers=headers)
+        if res.status_code == 304 and headers:
+            # The page did not change, so the cached one is still valid
+            self._store(url, page)
+            return page
+        page = Page(status_code=res.status_code, text=res.text,
+                    etag=res.headers.get("etag"), last_modified=res.headers.get("last-modified"))
+        if page.status_code < 500:
+            # Server errors are transient, so they are not cached
+            self._store(url, page)
+        return page
+
+    def _store(self, url: str, page: Page):
+        """Function used to put a page in the cache, evicting the least recently used ones if full.
+        A page larger than the whole cache is not stored.
+
+        Args:
+            url (str): The url of the page
+            page (Page): The page to store
+        """
+        self._discard(url)
+        size = sys.getsizeof(page.text)
+        if size > self._maxbytes:
+            return
+        self._cache[url] = (time.monotonic(), page)
+        self._bytes += size
+        while len(self._cache) > self._maxsize or self._bytes > self._maxbytes:
+            _, (_, evicted) = self._cache.popitem(last=False)
+            self._bytes -= sys.getsizeof(evicted.text)
+
+    def _discard(self, url: str):
+        """Function used to remove a page from the cache, if present
+
+        Args:
+            url (str): The url of the page
+        """
+        cached = self._cache.pop(url, None)
+        if cached is not None:
+            self._bytes -= sys.getsizeof(cached[1].text)
+
+    async def close(self):
+        """Function used to close the http client and its pooled connections"""
+        await self._client.aclose()
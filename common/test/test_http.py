@@ -0,0 +1,154 @@
+import sys
+from typing import Dict, List, NamedTuple, Optional
+import pytest
+
+from .. import http
+from ..http import Fetcher
+
+
+class FakeResponse(NamedTuple):
+    status_code: int
+    text: str
+    headers: Dict[str, str]
+
+
+class FakeClient:
+    def __init__(self):
+        self.pages: Dict[str, FakeResponse] = {}
+        self.requests: List[tuple] = []
+
+    def set(self, url: str, text: str, status_code: int = 200, headers: Optional[Dict[str, str]] = None):
+        self.pages[url] = FakeResponse(status_code, text, headers or {})
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> FakeResponse:
+        self.requests.append((url, headers or {}))
+        return self.pages[url]
+
+    async def aclose(self):
+        pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(http.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def make_fetcher(**kwargs) -> Fetcher:
+    fetcher = Fetcher(**kwargs)
+    fetcher._client = FakeClient()
+    return fetcher
+
+
+@pytest.mark.asyncio
+async def test_get_cached(clock: FakeClock):
+    """ Tests that a page is downloaded once while it is fresh, and again once expired. """
+    fetcher = make_fetcher(ttl=10)
+    fetcher._client.set("a", "page a")
+    assert (await fetcher.get("a")).text == "page a"
+    clock.now += 5
+    assert (await fetcher.get("a")).text == "page a"
+    assert len(fetcher._client.requests) == 1
+
+    clock.now += 10
+    fetcher._client.set("a", "new page a")
+    assert (await fetcher.get("a")).text == "new page a"
+    assert len(fetcher._client.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_errors(clock: FakeClock):
+    """ Tests that client errors are cached while server errors are not. """
+    fetcher = make_fetcher()
+    fetcher._client.set("missing", "not found", status_code=404)
+    fetcher._client.set("broken", "error", status_code=503)
+    for _ in range(2):
+        assert (await fetcher.get("missing")).status_code == 404
+        assert (await fetcher.get("broken")).status_code == 503
+    assert [url for url, _ in fetcher._client.requests] == ["missing", "broken", "broken"]
+
+
+@pytest.mark.asyncio
+async def test_evict_lru(clock: FakeClock):
+    """ Tests that the least recently used page is evicted when the cache has too many pages. """
+    fetcher = make_fetcher(maxsize=2)
+    for url in "abc":
+        fetcher._client.set(url, f"page {url}")
+    await fetcher.get("a")
+    await fetcher.get("b")
+    await fetcher.get("a")
+    await fetcher.get("c")
+    assert list(fetcher._cache) == ["a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_evict_bytes(clock: FakeClock):
+    """ Tests that pages are evicted when the cache holds too much text, and that larger pages are not cached. """
+    size = sys.getsizeof("x" * 100)
+    fetcher = make_fetcher(maxbytes=2 * size)
+    for url in "abc":
+        fetcher._client.set(url, url * 100)
+    fetcher._client.set("large", "x" * 1000)
+    for url in "abc":
+        await fetcher.get(url)
+    assert list(fetcher._cache) == ["b", "c"]
+    assert fetcher._bytes == 2 * size
+
+    await fetcher.get("large")
+    assert "large" not in fetcher._cache
+    assert fetcher._bytes == 2 * size
+
+
+@pytest.mark.asyncio
+async def test_revalidate_not_modified(clock: FakeClock):
+    """ Tests that an expired page with validators is revalidated, and kept if not modified. """
+    fetcher = make_fetcher(ttl=10)
+    validators = {"etag": '"v1"', "last-modified": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    fetcher._client.set("a", "page a", headers=validators)
+    page = await fetcher.get("a")
+    assert page.etag == '"v1"'
+
+    clock.now += 20
+    fetcher._client.set("a", "", status_code=304)
+    assert await fetcher.get("a") is page
+    assert fetcher._client.requests[-1] == ("a", {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"})
+
+    # The revalidated page is fresh again
+    clock.now += 5
+    assert await fetcher.get("a") is page
+    assert len(fetcher._client.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_revalidate_modified(clock: FakeClock):
+    """ Tests that an expired page is replaced when the provider sends a new version. """
+    fetcher = make_fetcher(ttl=10)
+    fetcher._client.set("a", "page a", headers={"etag": '"v1"'})
+    await fetcher.get("a")
+
+    clock.now += 20
+    fetcher._client.set("a", "new page a", headers={"etag": '"v2"'})
+    page = await fetcher.get("a")
+    assert (page.text, page.etag) == ("new page a", '"v2"')
+    assert fetcher._client.requests[-1] == ("a", {"If-None-Match": '"v1"'})
+    assert fetcher._cache["a"][1] is page
+
+
+@pytest.mark.asyncio
+async def test_no_validators(clock: FakeClock):
+    """ Tests that an expired page without validators is downloaded again without conditional headers. """
+    fetcher = make_fetcher(ttl=10)
+    fetcher._client.set("a", "page a")
+    await fetcher.get("a")
+    clock.now += 20
+    await fetcher.get("a")
+    assert fetcher._client.requests == [("a", {}), ("a", {})]
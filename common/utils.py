@@ -1,6 +1,9 @@
 from typing import Optional
 from os import environ
 import re
+import lxml.html
+from lxml import etree
+from lxml.html import HtmlElement
 
 
 def sanitize_string(s: Optional[str]) -> Optional[str]:
@@ -38,3 +41,33 @@ def get_env_variable(name: str, default=None) -> Optional[str]:
         message = "Expected environment variable '{}' not set.".format(name)
         print(message)
         return ""
+
+
+def parse_html(text: str) -> HtmlElement:
+    """Utility function to build the parse tree of an html page.
+    Styles and scripts are removed, so the text of the elements contains only the visible text.
+
+    Args:
+        text (str): the html page
+
+    Returns:
+        HtmlElement: the root of the parse tree
+    """
+    if not text.strip():
+        return lxml.html.Element("html")
+    tree = lxml.html.document_fromstring(text)
+    etree.strip_elements(tree, "style", "script", with_tail=False)
+    return tree
+
+
+def class_xpath(tag: str, cls: str) -> etree.XPath:
+    """Utility function to build the compiled XPath that finds the tags having a certain class.
+
+    Args:
+        tag (str): the name of the tags
+        cls (str): the class of the tags
+
+    Returns:
+        etree.XPath: the compiled XPath, returning the matching tags in document order
+    """
+    return etree.XPath(f"descendant-or-self::{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]")
@@ -1,4 +1,4 @@
-from os import getcwd, path
+from os import cpu_count, getcwd, path
 from common.utils import get_env_variable
 from dotenv import load_dotenv
 import logging
@@ -16,4 +16,15 @@ LOGGING_FORMAT = get_env_variable("LOGGING_FORMAT")
 _LOGGING_LEVEL = get_env_variable("LOGGING_LEVEL", "WARNING")
 LOGGING_LEVEL = getattr(logging, _LOGGING_LEVEL.upper())
 DEFAULT_MAX_AGE = 5000
-TRANSLATE_TIMEOUT = 10000
\ No newline at end of file
+TRANSLATE_TIMEOUT = 10000
+HTTP_TIMEOUT = 10.0
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE = 50
+CHANNEL_POOL_SIZE = 4
+SEARCH_TIMEOUT = 15.0
+HTTP_CACHE_SIZE = 512
+HTTP_CACHE_MAX_BYTES = 32 * 1024 * 1024
+HTTP_CACHE_TTL = 600
+CLOCK_RESOLUTION = 0.1
+TRANSLATION_CACHE_SIZE = 4096
+PARSE_WORKERS = cpu_count()
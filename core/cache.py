@@ -1,6 +1,13 @@
 from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from core.clock import clock
+from typing import Optional, Dict, Any, NamedTuple
+from responses.search import encode_success
+
+
+class CachedResult(NamedTuple):
+    """A result stored in the cache along with its serialized json"""
+    data: Dict[str, Any]
+    body: bytes
 
 
 class Cache:
@@ -9,7 +16,7 @@ class Cache:
         def nested_dict(): return defaultdict(nested_dict)
         self._cache = nested_dict()
 
-    def retrieve(self, q: str, long: bool, lang: str, maxage: int, provider: Optional[str] = None) -> Dict[str, Any]:
+    def retrieve(self, q: str, long: bool, lang: str, maxage: int, provider: Optional[str] = None) -> Optional[CachedResult]:
         """Function used to retrieve a value from cache with certain arguments shown below.
 
         Args:
@@ -20,9 +27,9 @@ class Cache:
             provider (str, optional): The specific provider of the informations. Defaults to None.
 
         Returns:
-            Dict[str, Any]: The cached result according the input arguments
+            Optional[CachedResult]: The cached result according the input arguments
         """
-        mindate = datetime.now() - timedelta(seconds=maxage)
+        mindate = clock.now() - maxage * 1000
         if q not in self._cache:
             return None
         values = []
@@ -40,12 +47,12 @@ class Cache:
         for v in values:
             if lang not in v:
                 continue
-            if mindate is not None and v[lang]["created_at"] >= mindate:
+            if mindate is not None and v[lang].data["created_at"] >= mindate:
                 return v[lang]
 
         for v in values:
             for lang, res in v.items():
-                if mindate is not None and res["original_language"] == res["current_language"] and res["created_at"] >= mindate:
+                if mindate is not None and res.data["original_language"] == res.data["current_language"] and res.data["created_at"] >= mindate:
                     return res
 
         return None
@@ -56,15 +63,15 @@ class Cache:
         Args:
             seconds (int): the minimum age of the result after which the cache has to be cleared
         """
-        maxdate = datetime.now() - timedelta(seconds=seconds)
+        maxdate = clock.now() - seconds * 1000
         for q in self._cache.values():
             for provider in q.values():
                 for long in provider.values():
-                    for lang in long.values():
-                        if lang["created_at"] < maxdate:
+                    for lang, res in list(long.items()):
+                        if res.data["created_at"] < maxdate:
                             del long[lang]
 
-    def add(self, q: str, provider: str, long: bool, lang: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    def add(self, q: str, provider: str, long: bool, lang: str, data: Dict[str, Any]) -> CachedResult:
         """Function used to add a result to the cache
 
         Args:
@@ -75,10 +82,10 @@ class Cache:
             data (Dict[str, Any]): The data to be added in the cache
 
         Returns:
-            Dict[str, Any]: The old data that was stored in place of the data currently inserted
+            CachedResult: The stored result along with its serialized json
         """
-        old_data = self._cache[q][provider][long][lang]
-        self._cache[q][provider][long][lang] = data
-        return old_data
+        cached = CachedResult(data=data, body=encode_success(data))
+        self._cache[q][provider][long][lang] = cached
+        return cached
 
 cache = Cache()
\ No newline at end of file
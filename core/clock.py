@@ -0,0 +1,29 @@
+import asyncio
+import time
+from config import CLOCK_RESOLUTION
+
+
+class Clock:
+    """Coarse clock storing the current time in milliseconds since the epoch.
+    The time is refreshed every resolution seconds by run(), so reading it costs no system call.
+    """
+    def __init__(self, resolution: float = CLOCK_RESOLUTION):
+        self._resolution = resolution
+        self._now = time.time_ns() // 1_000_000
+
+    def now(self) -> int:
+        """Function used to read the current time
+
+        Returns:
+            int: The milliseconds since the epoch, at most resolution seconds old
+        """
+        return self._now
+
+    async def run(self):
+        """Function used to keep the clock updated, it runs until cancelled"""
+        while True:
+            self._now = time.time_ns() // 1_000_000
+            await asyncio.sleep(self._resolution)
+
+
+clock = Clock()
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    """A call shared by all the callers asking for the same key"""
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class Coalescer:
+    """Coalescer used to run only once the identical calls made at the same time.
+    Callers asking for a key that is already running wait the running call instead of starting a new one.
+    """
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+    async def run(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args) -> Any:
+        """Function used to run func(*args), or to wait its result if a call with the same key is running.
+
+        Args:
+            key (Hashable): The key identifying the call
+            func (Callable[..., Awaitable[Any]]): The coroutine function to call
+            args: The arguments of func
+
+        Returns:
+            Any: The result of the call, shared by all the callers with the same key
+        """
+        call = self._calls.get(key)
+        if call is None or call.task.cancelled():
+            call = _Call(asyncio.ensure_future(func(*args)))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            # The call is cancelled only when nobody else is waiting for it.
+            # It is forgotten right away, so the callers coming next start a new call
+            if call.waiters == 1:
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+coalescer = Coalescer()
@@ -0,0 +1,73 @@
+import json
+import pytest
+
+from responses.search import SuccessResponse, encode_success
+from ..cache import Cache, CachedResult
+from ..clock import clock
+
+NOW = 1_700_000_000_123
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(clock, "_now", NOW)
+    return Cache()
+
+
+def make_result(provider="wikipediaen", lang="en", original="en", created_at=NOW):
+    return {
+        "data": "Hello is a salutation or greeting.",
+        "provider": provider,
+        "current_language": lang,
+        "original_language": original,
+        "created_at": created_at
+    }
+
+
+def test_add_retrieve(cache: Cache):
+    """ Tests that an added result is retrieved with its serialized json. """
+    result = make_result()
+    stored = cache.add("hello", "wikipediaen", False, "en", result)
+    assert isinstance(stored, CachedResult)
+    assert stored.body == encode_success(result)
+
+    assert cache.retrieve("hello", False, "en", 10) is stored
+    assert cache.retrieve("hello", False, "en", 10, "wikipediaen") is stored
+    assert cache.retrieve("hello", False, "en", 10, "britannica") is None
+    assert cache.retrieve("hello", True, "en", 10) is None
+    assert cache.retrieve("ciao", False, "en", 10) is None
+
+
+def test_retrieve_original_language(cache: Cache):
+    """ Tests that a result in its original language is retrieved for a search in another language. """
+    stored = cache.add("hello", "wikipediaen", False, "en", make_result())
+    assert cache.retrieve("hello", False, "it", 10) is stored
+
+    cache.add("ciao", "wikipediaen", False, "it", make_result(lang="it"))
+    assert cache.retrieve("ciao", False, "fr", 10) is None
+
+
+def test_retrieve_max_age(cache: Cache, monkeypatch):
+    """ Tests that a result older than the maximum age, in milliseconds of the clock, is not retrieved. """
+    stored = cache.add("hello", "wikipediaen", False, "en", make_result())
+    monkeypatch.setattr(clock, "_now", NOW + 10_000)
+    assert cache.retrieve("hello", False, "en", 10) is stored
+    monkeypatch.setattr(clock, "_now", NOW + 10_001)
+    assert cache.retrieve("hello", False, "en", 10) is None
+    assert cache.retrieve("hello", False, "en", 11) is stored
+
+
+def test_clear(cache: Cache, monkeypatch):
+    """ Tests that clear deletes only the expired results. """
+    cache.add("hello", "wikipediaen", False, "en", make_result(created_at=NOW - 20_000))
+    fresh = cache.add("hello", "wikipediaen", False, "it", make_result(lang="it", created_at=NOW))
+    cache.clear(10)
+    assert cache.retrieve("hello", False, "en", 3600) is None
+    assert cache.retrieve("hello", False, "it", 3600) is fresh
+
+
+@pytest.mark.parametrize("created_at", [NOW, NOW - 123])
+def test_encode_success(created_at):
+    """ Tests that encode_success produces the same json as SuccessResponse. """
+    result = make_result(created_at=created_at)
+    assert json.loads(encode_success(result)) == json.loads(SuccessResponse(**result).json())
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+
+from ..coalescer import Coalescer
+
+
+@pytest.fixture
+def coalescer():
+    return Coalescer()
+
+
+def counted(result, delay=0.05):
+    calls = []
+
+    async def func():
+        calls.append(None)
+        await asyncio.sleep(delay)
+        return result
+    return func, calls
+
+
+@pytest.mark.asyncio
+async def test_run_shared(coalescer: Coalescer):
+    """ Tests that identical concurrent calls share a single call. """
+    func, calls = counted("result")
+    results = await asyncio.gather(*(coalescer.run("key", func) for _ in range(5)))
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_run_sequential(coalescer: Coalescer):
+    """ Tests that a call is made again once the previous one is done. """
+    func, calls = counted("result", delay=0)
+    assert await coalescer.run("key", func) == "result"
+    assert await coalescer.run("key", func) == "result"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_exception(coalescer: Coalescer):
+    """ Tests that the exception of a shared call is raised to every caller. """
+    async def func():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    results = await asyncio.gather(coalescer.run("key", func), coalescer.run("key", func), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancel_one_waiter(coalescer: Coalescer):
+    """ Tests that cancelling a caller does not cancel the call shared with other callers. """
+    func, calls = counted("result")
+    a = asyncio.create_task(coalescer.run("key", func))
+    b = asyncio.create_task(coalescer.run("key", func))
+    await asyncio.sleep(0)
+    a.cancel()
+    assert await b == "result"
+    assert a.cancelled()
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cancel_last_waiter(coalescer: Coalescer):
+    """ Tests that a caller coming right after the last waiter is cancelled starts a new call. """
+    func, calls = counted("result")
+    a = asyncio.create_task(coalescer.run("key", func))
+    await asyncio.sleep(0)
+    a.cancel()
+    await asyncio.sleep(0)
+    # The cancelled call is not done yet, but it must not be shared with the new caller
+    b = asyncio.create_task(coalescer.run("key", func))
+    assert await b == "result"
+    assert a.cancelled()
+    assert len(calls) == 2
@@ -2,7 +2,7 @@
 # sources: scraper.proto
 # plugin: python-betterproto
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Union
 
 import betterproto
 from betterproto.grpc.grpclib_server import ServiceBase
@@ -28,6 +28,22 @@ class DisamiguousLink(betterproto.Message):
     url: str = betterproto.string_field(2)
 
 
+@dataclass(eq=False, repr=False)
+class StreamRequest(betterproto.Message):
+    req_id: str = betterproto.string_field(1)
+    text: str = betterproto.string_field(2)
+    long: bool = betterproto.bool_field(3)
+    cancel: bool = betterproto.bool_field(4)
+
+
+@dataclass(eq=False, repr=False)
+class StreamReply(betterproto.Message):
+    req_id: str = betterproto.string_field(1)
+    reply: "ScrapeReply" = betterproto.message_field(2)
+    status: int = betterproto.int32_field(3)
+    message: str = betterproto.string_field(4)
+
+
 class ScraperStub(betterproto.ServiceStub):
     async def search(self, *, text: str = "") -> "ScrapeReply":
 
@@ -45,6 +61,21 @@ class ScraperStub(betterproto.ServiceStub):
             "/scraper.Scraper/LongSearch", request, ScrapeReply
         )
 
+    async def search_stream(
+        self,
+        request_iterator: Union[
+            AsyncIterable["StreamRequest"], Iterable["StreamRequest"]
+        ],
+    ) -> AsyncIterator["StreamReply"]:
+
+        async for response in self._stream_stream(
+            "/scraper.Scraper/SearchStream",
+            request_iterator,
+            StreamRequest,
+            StreamReply,
+        ):
+            yield response
+
 
 class ScraperBase(ServiceBase):
     async def search(self, text: str) -> "ScrapeReply":
@@ -53,6 +84,11 @@ class ScraperBase(ServiceBase):
     async def long_search(self, text: str) -> "ScrapeReply":
         raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
 
+    async def search_stream(
+        self, request_iterator: AsyncIterator["StreamRequest"]
+    ) -> AsyncIterator["StreamReply"]:
+        raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
+
     async def __rpc_search(self, stream: grpclib.server.Stream) -> None:
         request = await stream.recv_message()
 
@@ -73,6 +109,15 @@ class ScraperBase(ServiceBase):
         response = await self.long_search(**request_kwargs)
         await stream.send_message(response)
 
+    async def __rpc_search_stream(self, stream: grpclib.server.Stream) -> None:
+        request_kwargs = {"request_iterator": stream.__aiter__()}
+
+        await self._call_rpc_handler_server_stream(
+            self.search_stream,
+            stream,
+            request_kwargs,
+        )
+
     def __mapping__(self) -> Dict[str, grpclib.const.Handler]:
         return {
             "/scraper.Scraper/Search": grpclib.const.Handler(
@@ -87,4 +132,10 @@ class ScraperBase(ServiceBase):
                 ScrapeRequest,
                 ScrapeReply,
             ),
+            "/scraper.Scraper/SearchStream": grpclib.const.Handler(
+                self.__rpc_search_stream,
+                grpclib.const.Cardinality.STREAM_STREAM,
+                StreamRequest,
+                StreamReply,
+            ),
         }
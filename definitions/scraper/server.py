@@ -1,9 +1,76 @@
 import asyncio
 import logging
+from typing import AsyncIterator, Dict, Optional
 
+from grpclib.const import Status
+from grpclib.exceptions import GRPCError
 from grpclib.server import Server
 from grpclib.utils import graceful_exit
 
+from . import ScraperBase, ScrapeReply, StreamRequest, StreamReply
+
+
+class StreamingScraperBase(ScraperBase):
+    """Base class of the scrapers that serves the searches also on a bidirectional stream.
+    The searches received on the stream run concurrently, and each reply is sent
+    as soon as it is ready along with the id of its request.
+    A request with the cancel flag cancels the running search with the same id, which gets no reply.
+    """
+    async def _stream_search(self, request: StreamRequest) -> StreamReply:
+        reply = StreamReply(req_id=request.req_id)
+        try:
+            if request.long:
+                result = await self.long_search(request.text)
+            else:
+                result = await self.search(request.text)
+            if not isinstance(result, ScrapeReply):
+                # The unary calls fail the same way when the handler returns no message
+                raise TypeError(f"Expected ScrapeReply, got {type(result).__name__}")
+            reply.reply = result
+        except GRPCError as e:
+            reply.status = e.status.value
+            reply.message = e.message or ""
+        except Exception:
+            logging.exception("Application error")
+            reply.status = Status.UNKNOWN.value
+            reply.message = "Internal Server Error"
+        return reply
+
+    async def search_stream(self, request_iterator: AsyncIterator[StreamRequest]) -> AsyncIterator[StreamReply]:
+        replies: "asyncio.Queue[Optional[StreamReply]]" = asyncio.Queue()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def search(request: StreamRequest):
+            replies.put_nowait(await self._stream_search(request))
+
+        async def read():
+            try:
+                async for request in request_iterator:
+                    if request.cancel:
+                        task = tasks.pop(request.req_id, None)
+                        if task is not None:
+                            task.cancel()
+                        continue
+                    task = asyncio.create_task(search(request))
+                    tasks[request.req_id] = task
+                    task.add_done_callback(lambda _, req_id=request.req_id: tasks.pop(req_id, None))
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+            finally:
+                replies.put_nowait(None)
+
+        reader = asyncio.create_task(read())
+        try:
+            while True:
+                reply = await replies.get()
+                if reply is None:
+                    break
+                yield reply
+            await reader
+        finally:
+            reader.cancel()
+            for task in list(tasks.values()):
+                task.cancel()
+
 
 class ScraperServer:
     def __init__(self, servicer, host="localhost", port=50051):
@@ -17,6 +84,9 @@ class ScraperServer:
             await server.start(self._host, self._port)
             logging.info(f'Serving on {self._host}:{self._port}')
             await server.wait_closed()
+        close = getattr(self._servicer, "close", None)
+        if close is not None:
+            await close()
 
     def run(self):
         asyncio.run(self.serve())
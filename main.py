@@ -1,50 +1,169 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+import asyncio
 from fastapi import HTTPException, Header, FastAPI, status, Response, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 from grpclib import GRPCError
 from core.middlewares.sentry import SentryMiddleware
 from core.middlewares.locale import LocaleMiddleware
-from providers import provide_by_language, providers_port_mapping, create_client, close_client
+from providers import provide_by_language, providers_port_mapping, create_pool, ChannelPool, StreamClient
+from definitions.scraper import ScrapeReply
 from common import utils
-from datetime import datetime
 from translation import translate
 from config import DEFAULT_MAX_AGE
-from core.cache import cache
+from core.cache import cache, CachedResult
+from core.coalescer import coalescer
+from core.clock import clock
 from frozendict import frozendict
-from definitions.scraper import ScraperStub
+from googletrans import LANGUAGES
 from log_config import init_logger
 import logging
 from responses.search import SuccessResponse, ConflictResponse
 import uvicorn
 
 logger: logging.Logger = init_logger()
-PROVIDERS: Dict[str, ScraperStub] = None
+PROVIDERS: Dict[str, ChannelPool] = None
+ROUTES: Dict[str, Tuple[Tuple[str, ChannelPool], ...]] = None
+CLOCK_TASK: asyncio.Task = None
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # app.add_middleware(HTTPSRedirectMiddleware)
 app.add_middleware(SentryMiddleware)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_headers=["*"])
-app.add_middleware(GZipMiddleware, minimum_size=1)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=1)
 app.add_middleware(LocaleMiddleware)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Startup function called at the start of the server"""
-    global PROVIDERS
-    PROVIDERS = frozendict({k: create_client("localhost", port) for k, port in providers_port_mapping.items()})
+    global PROVIDERS, ROUTES, CLOCK_TASK
+    CLOCK_TASK = asyncio.create_task(clock.run())
+    PROVIDERS = frozendict({k: create_pool("localhost", port) for k, port in providers_port_mapping.items()})
+    # The providers sorted by priority for every language accepted by LocaleMiddleware
+    ROUTES = frozendict({lang: tuple(provide_by_language(PROVIDERS, lang)) for lang in LANGUAGES})
     logging.info("Initialized providers")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """The shutdown function called at the shutdown of the server"""
-    for stub in PROVIDERS.values():
-        close_client(stub)
+    CLOCK_TASK.cancel()
+    for pool in PROVIDERS.values():
+        pool.close()
+
+
+def _parse_cache_control(cache_control: Optional[str]) -> Optional[int]:
+    """Function used to parse the value of cache_control http header.
+    It applies to the cache of the results only, the scrapers may still use the pages they downloaded recently.
+
+    Args:
+        cache_control (Optional[str]): The value of cache_control http header
+
+    Returns:
+        Optional[int]: The maximum age of the acceptable cached results, None if the cache must not be used
+    """
+    if cache_control is None:
+        return DEFAULT_MAX_AGE
+    max_age = DEFAULT_MAX_AGE
+    for directive in cache_control.split(","):
+        name, _, value = directive.partition("=")
+        name, value = name.strip().lower(), value.strip()
+        if name in ("no-cache", "no-store"):
+            return None
+        if name == "max-age" and value.isdigit():
+            max_age = int(value)
+    return max_age
+
+
+def _success_response(cached: CachedResult, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Function used to send a result with the json serialized by the cache.
+    Returning a Response skips the validation of response_model, which is kept only for the documentation.
+
+    Args:
+        cached (CachedResult): The result stored in the cache
+        headers (Optional[Dict[str, str]], optional): The additional http headers. Defaults to None.
+
+    Returns:
+        Response: The http response with the serialized SuccessResponse
+    """
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+async def _call_stub(stub: StreamClient, q: str, long: bool) -> ScrapeReply:
+    """Function used to make the search RPC on a provider.
+
+    Args:
+        stub (StreamClient): The client connected to the provider
+        q (str): The text to search
+        long (bool): If the search is long or short
+
+    Returns:
+        ScrapeReply: The reply of the provider
+    """
+    if long:
+        return await stub.long_search(text=q)
+    return await stub.search(text=q)
+
+
+async def _search_stub(p: str, stub: StreamClient, q: str, long: bool) -> Optional[Dict[str, Any]]:
+    """Function used to search on a provider, logging its failures.
+
+    Args:
+        p (str): The name of the provider
+        stub (StreamClient): The client connected to the provider
+        q (str): The text to search
+        long (bool): If the search is long or short
+
+    Returns:
+        Optional[Dict[str, Any]]: The result of the provider, None if the provider failed
+    """
+    try:
+        # Identical searches running at the same time share the same RPC
+        result = await coalescer.run((p, long, q), _call_stub, stub, q, long)
+    except GRPCError as e:
+        logger.info(f"Provider '{p}' failed to find '{q}'\n"
+                    f"Error code: '{e.status}'\n"
+                    f"Message: '{e.message}'" if hasattr(e, 'message') else "")
+        return None
+    except ConnectionRefusedError as e:
+        logger.error(f"Unable to connect to provider '{p}': Connection Refused")
+        return None
+    except Exception as e:
+        logger.error(e)
+        return None
+    logger.info(f"Received {result}")
+    return result.to_dict()
+
+
+async def _first_by_priority(tasks: List[asyncio.Task]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """Function used to wait the result of the searches launched concurrently on the providers.
+    The result of a provider is accepted as soon as all the providers with higher priority failed,
+    then the searches still running are cancelled.
+
+    Args:
+        tasks (List[asyncio.Task]): The searches, named after their provider and sorted by priority
+
+    Returns:
+        Tuple[Optional[str], Optional[Dict[str, Any]]]: The provider and its result, (None, None) if all the providers failed
+    """
+    pending = set(tasks)
+    try:
+        while True:
+            for t in tasks:
+                if not t.done():
+                    break
+                if t.result() is not None:
+                    return t.get_name(), t.result()
+            else:
+                return None, None
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for t in tasks:
+            t.cancel()
 
 
 @app.get("/search", response_model=SuccessResponse, responses={status.HTTP_409_CONFLICT: {"model": ConflictResponse}})
@@ -64,36 +183,22 @@ async def search(req: Request, res: Response, q: str, long: bool = False, cache_
     Returns:
         SuccessResponse: The result of the search
     """
-    result = None
-    if cache_control is None or not (cache_control.startswith("max-age=") or cache_control.startswith("no-cache")):
-        result = cache.retrieve(q, long, req.state.lang, DEFAULT_MAX_AGE)
-    elif cache_control.startswith("max-age="):
-        result = cache.retrieve(q, long, req.state.lang, int(cache_control.replace("max-age=", "")))
+    cached = None
+    max_age = _parse_cache_control(cache_control)
+    if max_age is not None:
+        cached = cache.retrieve(q, long, req.state.lang, max_age)
+    if cached is not None and cached.data["current_language"] == req.state.lang:
+        # The cached json is sent as is, skipping validation and serialization
+        return _success_response(cached, {"X-Cache": "HIT"})
+    result = cached.data if cached is not None else None
 
     if result is None:
         # Retrieve from services
 
-        result_provider = None
-        for p, stub in provide_by_language(PROVIDERS, req.state.lang):
-            # iterate over providers
-            result_provider = p
-            try:
-                if long:
-                    result = await stub.long_search(text=q)
-                else:
-                    result = await stub.search(text=q)
-            except GRPCError as e:
-                logger.info(f"Provider '{p}' failed to find '{q}'\n"
-                            f"Error code: '{e.status}'\n"
-                            f"Message: '{e.message}'" if hasattr(e, 'message') else "")
-            except ConnectionRefusedError as e:
-                logger.error(f"Unable to connect to provider '{p}': Connection Refused")
-            except Exception as e:
-                logger.error(e)
-            if result is not None:
-                logger.info(f"Received {result}")
-                result = result.to_dict()
-                break
+        # Query all the providers concurrently, keeping the result of the one with highest priority
+        tasks = [asyncio.create_task(_search_stub(p, pool.next(), q, long), name=p)
+                 for p, pool in ROUTES[req.state.lang]]
+        result_provider, result = await _first_by_priority(tasks)
 
         # Find result_provider
         if result is None:
@@ -106,13 +211,13 @@ async def search(req: Request, res: Response, q: str, long: bool = False, cache_
             "provider": result_provider,
             "current_language": result["language"],
             "original_language": result["language"],
-            "created_at": datetime.now()
+            "created_at": clock.now()
         }
-        cache.add(q, result_provider, long, result["current_language"], result)
+        cached = cache.add(q, result_provider, long, result["current_language"], result)
     if result["current_language"] != req.state.lang:
         result = translate(result, req.state.lang)
-        cache.add(q, result["provider"], long, req.state.lang, result)
-    return result
+        cached = cache.add(q, result["provider"], long, req.state.lang, result)
+    return _success_response(cached)
 
 
 @app.get("/search/{provider}", response_model=SuccessResponse, responses={status.HTTP_409_CONFLICT: {"model": ConflictResponse}})
@@ -137,19 +242,20 @@ async def search_provider(req: Request, res: Response, q: str, provider: str, lo
     if not provider in PROVIDERS:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="provider_not_available")
 
-    result = None
-    if cache_control is None or not (cache_control.startswith("max-age=") or cache_control.startswith("no-cache")):
-        result = cache.retrieve(q, long, req.state.lang, DEFAULT_MAX_AGE, provider)
-    elif cache_control.startswith("max-age="):
-        result = cache.retrieve(q, long, req.state.lang, int(cache_control.replace("max-age=", "")), provider)
+    cached = None
+    max_age = _parse_cache_control(cache_control)
+    if max_age is not None:
+        cached = cache.retrieve(q, long, req.state.lang, max_age, provider)
+    if cached is not None and cached.data["current_language"] == req.state.lang:
+        # The cached json is sent as is, skipping validation and serialization
+        return _success_response(cached, {"X-Cache": "HIT"})
+    result = cached.data if cached is not None else None
 
     if result is None:
         # Retrieve from services
+        stub = PROVIDERS[provider].next()
         try:
-            if long:
-                result = await PROVIDERS[provider].long_search(text=q)
-            else:
-                result = await PROVIDERS[provider].search(text=q)
+            result = await coalescer.run((provider, long, q), _call_stub, stub, q, long)
         except GRPCError as e:
             logger.info(f"Provider '{provider}' failed to find '{q}'\n"
                            f"Error code: '{e.status}'\n"
@@ -172,13 +278,13 @@ async def search_provider(req: Request, res: Response, q: str, provider: str, lo
             "provider": provider,
             "current_language": result["language"],
             "original_language": result["language"],
-            "created_at": datetime.now()
+            "created_at": clock.now()
         }
-        cache.add(q, provider, long, result["current_language"], result)
+        cached = cache.add(q, provider, long, result["current_language"], result)
     if result["current_language"] != req.state.lang:
         result = translate(result, req.state.lang)
-        cache.add(q, result["provider"], long, req.state.lang, result)
-    return result
+        cached = cache.add(q, result["provider"], long, req.state.lang, result)
+    return _success_response(cached)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,11 @@
-from config import TRECCANI_PORT, WIKIPEDIA_EN_PORT, WIKIPEDIA_IT_PORT, BRITANNICA_PORT, SAPERE_PORT
-from definitions.scraper import ScraperStub
+import asyncio
+import itertools
+from typing import AsyncIterator, Dict, List, Optional
+from config import TRECCANI_PORT, WIKIPEDIA_EN_PORT, WIKIPEDIA_IT_PORT, BRITANNICA_PORT, SAPERE_PORT, CHANNEL_POOL_SIZE, SEARCH_TIMEOUT
+from definitions.scraper import ScraperStub, ScrapeReply, StreamRequest, StreamReply
 from grpclib.client import Channel
+from grpclib.const import Status
+from grpclib.exceptions import GRPCError
 
 
 def create_client(host, port) -> ScraperStub:
@@ -12,6 +17,120 @@ def close_client(stub: ScraperStub):
     stub.channel.close()
 
 
+class StreamClient:
+    """Client of a provider that sends all the searches on a single bidirectional stream.
+    Every search is tagged with an id, and the task receiving the replies resolves the search with the same id.
+    The stream is opened at the first search, and opened again at the first search after a failure.
+    A cancelled search is cancelled on the provider too, with a request carrying the cancel flag.
+    A search without a reply within the timeout fails, and if nothing at all was received
+    in the meanwhile the stream is considered broken and closed, so the next search opens a new one.
+    """
+    def __init__(self, stub: ScraperStub, timeout: float = SEARCH_TIMEOUT):
+        self._stub = stub
+        self._timeout = timeout
+        self._replied_at = 0.0
+        self._ids = itertools.count()
+        self._waiting: Dict[str, asyncio.Future] = {}
+        self._requests: Optional["asyncio.Queue[StreamRequest]"] = None
+        self._receiver: Optional[asyncio.Task] = None
+
+    async def search(self, *, text: str = "") -> ScrapeReply:
+        return await self._search(text, False)
+
+    async def long_search(self, *, text: str = "") -> ScrapeReply:
+        return await self._search(text, True)
+
+    async def _search(self, text: str, long: bool) -> ScrapeReply:
+        if self._receiver is None or self._receiver.done():
+            self._requests = asyncio.Queue()
+            self._waiting = {}
+            self._receiver = asyncio.create_task(self._receive(self._requests, self._waiting))
+        requests, waiting, receiver = self._requests, self._waiting, self._receiver
+        req_id = str(next(self._ids))
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiting[req_id] = future
+        requests.put_nowait(StreamRequest(req_id=req_id, text=text, long=long))
+        started_at = loop.time()
+        try:
+            reply: StreamReply = await asyncio.wait_for(future, self._timeout)
+        except asyncio.TimeoutError:
+            if self._replied_at < started_at:
+                # Nothing was received while waiting, so the stream is stuck
+                receiver.cancel()
+                if self._receiver is receiver:
+                    self._receiver = None
+            else:
+                requests.put_nowait(StreamRequest(req_id=req_id, cancel=True))
+            raise GRPCError(Status.DEADLINE_EXCEEDED, "Search timed out")
+        except asyncio.CancelledError:
+            # The provider stops the search instead of running it for nobody,
+            # unless the reply already arrived
+            if future.cancelled():
+                requests.put_nowait(StreamRequest(req_id=req_id, cancel=True))
+            raise
+        finally:
+            del waiting[req_id]
+        if reply.status != Status.OK.value:
+            raise GRPCError(Status(reply.status), reply.message)
+        return reply.reply
+
+    async def _send(self, requests: "asyncio.Queue[StreamRequest]") -> AsyncIterator[StreamRequest]:
+        while True:
+            yield await requests.get()
+
+    async def _receive(self, requests: "asyncio.Queue[StreamRequest]", waiting: Dict[str, asyncio.Future]):
+        error: Exception = GRPCError(Status.UNAVAILABLE, "Stream closed")
+        try:
+            async for reply in self._stub.search_stream(self._send(requests)):
+                self._replied_at = asyncio.get_running_loop().time()
+                future = waiting.get(reply.req_id)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except Exception as e:
+            error = e
+        finally:
+            # The searches still waiting will never receive a reply on this stream
+            for future in waiting.values():
+                if not future.done():
+                    future.set_exception(error)
+
+    def close(self):
+        """Function used to close the stream and the channel of the client"""
+        if self._receiver is not None:
+            self._receiver.cancel()
+        close_client(self._stub)
+
+
+class ChannelPool:
+    """Pool of clients connected to the same provider, each one on its own channel.
+    Clients are handed out in round-robin so that concurrent searches are spread
+    over several HTTP/2 connections instead of sharing a single one.
+    """
+    def __init__(self, clients: List[StreamClient]):
+        self._clients = clients
+        self._i = 0
+
+    def next(self) -> StreamClient:
+        """Function used to get the next client of the pool
+
+        Returns:
+            StreamClient: The client to use for the next call
+        """
+        client = self._clients[self._i]
+        self._i = (self._i + 1) % len(self._clients)
+        return client
+
+    def close(self):
+        """Function used to close all the channels of the pool"""
+        for client in self._clients:
+            client.close()
+
+
+def create_pool(host, port, size=CHANNEL_POOL_SIZE) -> ChannelPool:
+    return ChannelPool([StreamClient(create_client(host, port)) for _ in range(size)])
+
+
 providers_port_mapping = {
     "britannica": BRITANNICA_PORT,
     "treccani": TRECCANI_PORT,
@@ -1,7 +1,8 @@
 from doctest import ELLIPSIS_MARKER
-import requests
 from bs4 import BeautifulSoup as bs
-from definitions.scraper import ScraperBase, ScrapeReply, DisamiguousLink
+from definitions.scraper import ScrapeReply, DisamiguousLink
+from definitions.scraper.server import StreamingScraperBase
+from common.http import Fetcher
 from urllib.parse import urljoin
 from typing import Callable, Tuple, List, Dict
 
@@ -9,11 +10,18 @@ from grpclib.exceptions import GRPCError
 from grpclib.const import Status
 
 
-class ScraperBritannica(ScraperBase):
+class ScraperBritannica(StreamingScraperBase):
     _BASE_URL = "https://www.britannica.com"
     _SEARCH_QUERY = "/search?query="
     _SEARCH_URL = _BASE_URL + _SEARCH_QUERY
 
+    def __init__(self):
+        self._fetcher = Fetcher()
+
+    async def close(self):
+        """Function used to close the http client of the scraper"""
+        await self._fetcher.close()
+
     def _is_url(self, text: str) -> bool:
         """ Verify if a string is an url.
 
@@ -49,7 +57,7 @@ class ScraperBritannica(ScraperBase):
         """
         return str.replace("\r", "").replace("\n", "").replace("\t", "").strip()
 
-    def _search_scraping(self, url: str) -> List[Dict[str, str]]:
+    async def _search_scraping(self, url: str) -> List[Dict[str, str]]:
         """ The scrape function used to search on provider.
 
         Args:
@@ -61,12 +69,12 @@ class ScraperBritannica(ScraperBase):
         Return:
             A list of dict where every dict as a label that rappresent a disambigous search and short description, and url of the disambigous search
         """
-        r = requests.get(url)
+        r = await self._fetcher.get(url)
 
         if r.status_code != 200:
             raise GRPCError(status=Status.INTERNAL, message="Request to provider failed")
 
-        soup = bs(r.content, "lxml")
+        soup = bs(r.text, "lxml")
 
         container = soup.find("ul", class_="list-unstyled results")
         if not container:
@@ -86,7 +94,7 @@ class ScraperBritannica(ScraperBase):
         
         return result
 
-    def _long_scraping(self, url: str) -> str:
+    async def _long_scraping(self, url: str) -> str:
         """ The scrape function used to get a long description of a item on provider.
 
         Args:
@@ -98,11 +106,11 @@ class ScraperBritannica(ScraperBase):
         Return:
             A string that contains a long description of item
         """
-        r = requests.get(url)
+        r = await self._fetcher.get(url)
 
         if r.status_code != 200:
             raise GRPCError(status=Status.INTERNAL, message="Request to provider failed")
-        soup = bs(r.content, "lxml")
+        soup = bs(r.text, "lxml")
 
         paragraphs = soup.find('div', {"class": "topic-content"}).find_all("section")
         result = ""
@@ -115,7 +123,7 @@ class ScraperBritannica(ScraperBase):
             raise GRPCError(status=Status.NOT_FOUND, message="Result not found")
         return result
 
-    def _short_scraping(self, url: str) -> str:
+    async def _short_scraping(self, url: str) -> str:
         """ The scrape function used to get a short description of a item on provider.
 
         Args:
@@ -127,10 +135,10 @@ class ScraperBritannica(ScraperBase):
         Return:
             A string that contains a short description of item
         """
-        r = requests.get(url)
+        r = await self._fetcher.get(url)
         if r.status_code != 200:
             raise GRPCError(status=Status.INTERNAL, message="Request to provider failed")
-        soup = bs(r.content, "lxml")
+        soup = bs(r.text, "lxml")
 
         paragraphs = soup.find('div', {"class": "topic-content"})
         result = ""
@@ -202,7 +210,7 @@ class ScraperBritannica(ScraperBase):
         r = None
         disambigous, strategy, param = self._choose_strategy(text, False)
 
-        r=strategy(param)
+        r=await strategy(param)
 
         if not r:
             raise GRPCError(status=Status.NOT_FOUND, message="Result not found")
@@ -235,7 +243,7 @@ class ScraperBritannica(ScraperBase):
         r = None
         disambigous, strategy, param = self._choose_strategy(text, True)
 
-        r=strategy(param)
+        r=await strategy(param)
 
         if not r:
             raise GRPCError(status=Status.NOT_FOUND, message="Result not found")
@@ -8,8 +8,10 @@ from .. import ScraperBritannica
 
 
 @pytest.fixture
-def client():
-    return ScraperBritannica()
+async def client():
+    client = ScraperBritannica()
+    yield client
+    await client.close()
 
 
 @pytest.mark.asyncio
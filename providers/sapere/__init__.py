@@ -1,8 +1,9 @@
-import requests
 from bs4 import BeautifulSoup as bs
 import re
 
-from definitions.scraper import ScraperBase, ScrapeReply, DisamiguousLink
+from definitions.scraper import ScrapeReply, DisamiguousLink
+from definitions.scraper.server import StreamingScraperBase
+from common.http import Fetcher
 import logging
 from urllib.parse import urljoin
 
@@ -10,11 +11,18 @@ from typing import Callable, Tuple, List, Dict
 from grpclib.exceptions import GRPCError
 from grpclib.const import Status
 
-class ScraperSapereIT(ScraperBase):
+class ScraperSapereIT(StreamingScraperBase):
     _BASE_URL = "https://www.sapere.it"
     _SEARCH_QUERY = "/sapere/search.html?q1="
     _SEARCH_URL = _BASE_URL + _SEARCH_QUERY
 
+    def __init__(self):
+        self._fetcher = Fetcher()
+
+    async def close(self):
+        """Function used to close the http client of the scraper"""
+        await self._fetcher.close()
+
     def _is_url(self, text: str) -> bool:
         """ Verify if a string is an url.
 
@@ -50,7 +58,7 @@ class ScraperSapereIT(ScraperBase):
         """
         return str.replace("\r", " ").replace("\n", " ").replace("\t", "").strip()
 
-    def _search_scraping(self, url: str) -> List[Dict[str, str]]:
+    async def _search_scraping(self, url: str) -> List[Dict[str, str]]:
         """ The scrape function used to search on provider.
 
         Args:
@@ -62,12 +70,12 @@ class ScraperSapereIT(ScraperBase):
         Return:
             A list of dict where every dict as a label that rappresent a disambigous search and short description, and url of the disambigous search
         """
-        r = requests.get(url)
+        r = await self._fetcher.get(url)
 
         if r.status_code != 200:
             raise GRPCError(status=Status.INTERNAL, message="Request to provider failed")
 
-        soup = bs(r.content, "lxml")
+        soup = bs(r.text, "lxml")
 
         container = soup.find("ul", class_="search-results-list")
         if not container:
@@ -86,7 +94,7 @@ class ScraperSapereIT(ScraperBase):
         
         return result
 
-    def _long_scraping(self, url: str) -> str:
+    async def _long_scraping(self, url: str) -> str:
         """ The scrape function used to get a long description of a item on provider.
 
         Args:
@@ -98,11 +106,11 @@ class ScraperSapereIT(ScraperBase):
         Return:
             A string that contains a long description of item
         """
-        r = requests.get(url)
+        r = await self._fetcher.get(url)
 
         if r.status_code != 200:
             raise GRPCError(status=Status.INTERNAL, message="Request to provider failed")
-        soup = bs(r.content, "lxml")
+        soup = bs(r.text, "lxml")
 
         paragraphs = soup.findAll('div', {"id": re.compile('^p')})
         logging.info(len(paragraphs))
@@ -122,7 +130,7 @@ class ScraperSapereIT(ScraperBase):
 
         return result
 
-    def _short_scraping(self, url: str) -> str:
+    async def _short_scraping(self, url: str) -> str:
         """ The scrape function used to get a short description of a item on provider.
 
         Args:
@@ -135,12 +143,12 @@ class ScraperSapereIT(ScraperBase):
             A string that contains a short description of item
         """
 
-        r = requests.get(url)
+        r = await self._fetcher.get(url)
 
         if r.status_code != 200:
             raise GRPCError(status=Status.INTERNAL, message="Request to provider failed")
 
-        soup = bs(r.content, "lxml")
+        soup = bs(r.text, "lxml")
 
         paragraphs = soup.findAll('div', {"id": re.compile('^p')})
         sub_result = ""
@@ -220,7 +228,7 @@ class ScraperSapereIT(ScraperBase):
         r = None
         disambigous, strategy, param = self._choose_strategy(text, False)
 
-        r=strategy(param)
+        r=await strategy(param)
 
         logging.info(f'r={r}')
 
@@ -255,7 +263,7 @@ class ScraperSapereIT(ScraperBase):
         r = None
         disambigous, strategy, param = self._choose_strategy(text, True)
 
-        r=strategy(param)
+        r=await strategy(param)
 
         if not r:
             raise GRPCError(status=Status.NOT_FOUND, message="Result not found")
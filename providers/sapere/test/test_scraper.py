@@ -8,8 +8,10 @@ from .. import ScraperSapereIT
 
 
 @pytest.fixture
-def client():
-    return ScraperSapereIT()
+async def client():
+    client = ScraperSapereIT()
+    yield client
+    await client.close()
 
 
 @pytest.mark.asyncio
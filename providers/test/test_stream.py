@@ -0,0 +1,160 @@
+import asyncio
+import socket
+from grpclib import GRPCError
+from grpclib.const import Status
+from grpclib.server import Server
+import pytest
+from typing import AsyncIterator
+
+from definitions.scraper import ScrapeReply, StreamRequest, StreamReply
+from definitions.scraper.server import StreamingScraperBase
+from .. import StreamClient, create_client
+
+
+class FakeScraper(StreamingScraperBase):
+    def __init__(self):
+        self.started = []
+        self.cancelled = []
+        self.stuck = False
+
+    async def _reply(self, text: str, long: bool) -> ScrapeReply:
+        self.started.append(text)
+        if text == "missing":
+            raise GRPCError(status=Status.NOT_FOUND, message="Text not found")
+        if text == "broken":
+            raise ValueError("broken")
+        if text == "empty":
+            return None
+        if text.startswith("slow"):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                self.cancelled.append(text)
+                raise
+        return ScrapeReply(language="en", data=f"{'long ' if long else ''}{text}")
+
+    async def search(self, text: str) -> ScrapeReply:
+        return await self._reply(text, False)
+
+    async def long_search(self, text: str) -> ScrapeReply:
+        return await self._reply(text, True)
+
+    async def search_stream(self, request_iterator: AsyncIterator[StreamRequest]) -> AsyncIterator[StreamReply]:
+        if self.stuck:
+            # A handler that keeps the stream open without ever replying
+            await asyncio.sleep(3600)
+        async for reply in super().search_stream(request_iterator):
+            yield reply
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+async def scraper():
+    scraper = FakeScraper()
+    server = Server([scraper])
+    scraper.port = free_port()
+    await server.start("127.0.0.1", scraper.port)
+    yield scraper
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.fixture
+async def client(scraper: FakeScraper):
+    client = StreamClient(create_client("127.0.0.1", scraper.port))
+    yield client
+    client.close()
+
+
+async def wait_until(condition, timeout=1.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+@pytest.mark.asyncio
+async def test_search_success(client: StreamClient):
+    """ Tests the short and long searches on the stream. """
+    res = await client.search(text="hello")
+    assert res.data == "hello"
+    res = await client.long_search(text="hello")
+    assert res.data == "long hello"
+
+
+@pytest.mark.asyncio
+async def test_search_concurrent(client: StreamClient):
+    """ Tests that concurrent searches on the same stream receive their own replies. """
+    texts = [f"text{i}" for i in range(20)]
+    results = await asyncio.gather(*(client.search(text=t) for t in texts))
+    assert [r.data for r in results] == texts
+
+
+@pytest.mark.asyncio
+async def test_search_failed(client: StreamClient):
+    """ Tests that the errors of the provider are raised as GRPCError. """
+    with pytest.raises(GRPCError) as excinfo:
+        await client.search(text="missing")
+    assert excinfo.value.status == Status.NOT_FOUND
+    assert excinfo.value.message == "Text not found"
+
+    with pytest.raises(GRPCError) as excinfo:
+        await client.search(text="broken")
+    assert excinfo.value.status == Status.UNKNOWN
+
+    # A handler returning no reply fails like it does on the unary calls
+    with pytest.raises(GRPCError) as excinfo:
+        await client.search(text="empty")
+    assert excinfo.value.status == Status.UNKNOWN
+
+    # The stream is still usable after the failures
+    assert (await client.search(text="hello")).data == "hello"
+
+
+@pytest.mark.asyncio
+async def test_search_cancelled(scraper: FakeScraper, client: StreamClient):
+    """ Tests that cancelling a search cancels it on the provider too. """
+    slow = asyncio.create_task(client.search(text="slow"))
+    await wait_until(lambda: "slow" in scraper.started)
+    slow.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await slow
+    await wait_until(lambda: "slow" in scraper.cancelled)
+    assert (await client.search(text="hello")).data == "hello"
+
+
+@pytest.mark.asyncio
+async def test_search_timeout(scraper: FakeScraper):
+    """ Tests that a slow search times out and is cancelled, leaving the stream open. """
+    client = StreamClient(create_client("127.0.0.1", scraper.port), timeout=0.3)
+    try:
+        slow = asyncio.create_task(client.search(text="slow"))
+        assert (await client.search(text="hello")).data == "hello"
+        with pytest.raises(GRPCError) as excinfo:
+            await slow
+        assert excinfo.value.status == Status.DEADLINE_EXCEEDED
+        await wait_until(lambda: "slow" in scraper.cancelled)
+        assert not client._receiver.done()
+    finally:
+        client.close()
+
+
+@pytest.mark.asyncio
+async def test_search_stuck_stream(scraper: FakeScraper):
+    """ Tests that a stream that never replies is closed, and opened again by the next search. """
+    client = StreamClient(create_client("127.0.0.1", scraper.port), timeout=0.3)
+    try:
+        scraper.stuck = True
+        with pytest.raises(GRPCError) as excinfo:
+            await client.search(text="hello")
+        assert excinfo.value.status == Status.DEADLINE_EXCEEDED
+        scraper.stuck = False
+        assert (await client.search(text="hello")).data == "hello"
+    finally:
+        client.close()
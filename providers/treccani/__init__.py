@@ -1,35 +1,76 @@
-from definitions.scraper import ScraperBase, ScrapeReply, DisamiguousLink
-import requests
-import requests
-from bs4 import BeautifulSoup
+from definitions.scraper import ScrapeReply, DisamiguousLink
+from definitions.scraper.server import StreamingScraperBase
+from common.http import Fetcher
+from common.utils import parse_html, class_xpath
+from lxml.html import HtmlElement
 from unicodedata import category, normalize
-import unicodedata
+import sys
+from urllib.parse import quote
 from grpclib.exceptions import GRPCError
 from grpclib.const import Status
 
+# Translation table that drops the combining marks left by the NFD normalization
+_COMBINING = dict.fromkeys(c for c in range(sys.maxunicode + 1) if category(chr(c)) == 'Mn')
+# Translation table that also drops the other numbers and letters, like the superscripts of the titles
+_STRIP = dict.fromkeys(c for c in range(sys.maxunicode + 1) if category(chr(c)) in ('Mn', 'No', 'Lo'))
+_FULL_CONTENT = class_xpath('div', 'module-article-full_content')
+_ABSTRACT = class_xpath('div', 'abstract')
+_SEARCH_TITLES = class_xpath('h2', 'search_preview-title')
 
-class ScraperTreccani(ScraperBase):
 
-    def _scrape_treccani(self, soup: BeautifulSoup) -> str:
+def _normalize(text: str) -> str:
+    """Function used to remove accents, superscripts and non latin letters from a string
+
+    Args:
+        text(str): the string to normalize
+
+    Returns:
+        str: the normalized string
+    """
+    return normalize('NFD', text).translate(_STRIP)
+
+
+def _remove_accents(text: str) -> str:
+    """Function used to remove only the accents from a string, keeping superscripts and non latin letters
+
+    Args:
+        text(str): the string to normalize
+
+    Returns:
+        str: the string without accents
+    """
+    return normalize('NFD', text).translate(_COMBINING)
+
+
+class ScraperTreccani(StreamingScraperBase):
+
+    def __init__(self):
+        self._fetcher = Fetcher()
+
+    async def close(self):
+        """Function used to close the http client of the scraper"""
+        await self._fetcher.close()
+
+    def _scrape_treccani(self, tree: HtmlElement) -> HtmlElement:
         """Function used to make the scraping of the pages
 
         Args:
-            soup(BeautifulSoup): Parse tree used for analize the page
+            tree(HtmlElement): Parse tree used for analize the page
             
         Returns:
-            str: the summary(first paragraph)
+            HtmlElement: the summary(first paragraph)
             """
-        summary = soup.find('div', {'class': 'module-article-full_content'})
-        if summary is None:
-            for_page_with_vedi_altro = soup.find('div', {'class': 'abstract'})
-            return for_page_with_vedi_altro
-        return summary
+        summary = _FULL_CONTENT(tree)
+        if len(summary) == 0:
+            for_page_with_vedi_altro = _ABSTRACT(tree)
+            return for_page_with_vedi_altro[0] if len(for_page_with_vedi_altro) > 0 else None
+        return summary[0]
 
-    def _disambiguity_page(self, search_term, soup: BeautifulSoup) -> list:
+    def _disambiguity_page(self, search_term, tree: HtmlElement) -> list:
         """Function that manages the disambiguity pages
 
         Args:
-            soup(BeautifulSoup): Parse tree used for analize the page
+            tree(HtmlElement): Parse tree used for analize the page
             
         Returns:
             list: The disambiguity list
@@ -37,14 +78,14 @@ class ScraperTreccani(ScraperBase):
         url_base = 'https://www.treccani.it'
         final_list = []
         final_map = {}
-        h2 = soup.find_all('h2', {'class': 'search_preview-title'})
+        h2 = _SEARCH_TITLES(tree)
         for h in h2:
-            h_good = "".join(c for c in h.text.strip() if unicodedata.category(c) not in ["No", "Lo"])
-            h_good = ''.join(c for c in normalize('NFD', h_good) if category(c) != 'Mn')
+            h_text = h.text_content().strip()
+            h_good = _normalize(h_text)
             if h_good == search_term or search_term in h_good:
-                child = h.find('a')
+                child = h.find('.//a')
                 url_final = url_base + child.get('href')
-                final_map = DisamiguousLink(label=h.text.strip(), url=url_final)
+                final_map = DisamiguousLink(label=h_text, url=url_final)
                 final_list.append(final_map)
         return final_list
 
@@ -65,50 +106,42 @@ class ScraperTreccani(ScraperBase):
         if 'www.treccani.it' in text:
             if 'www.treccani.it/vocabolario/ricerca' in text:
                 possible_disambiguity = True
+                search_term = text.replace('https://www.treccani.it/vocabolario/ricerca/', '').replace('/', '')
         else:
-            text = ''.join(c for c in normalize('NFD', text) if category(c) != 'Mn')
-            text = text.strip().lower().split()
+            search_term = ' '.join(_remove_accents(text).lower().split())
             prefix = f'https://www.treccani.it/vocabolario/ricerca/'
-            query = "_".join(text)
-            processed_query = '_'.join(query.split())
-            endpoint = f'{prefix}{processed_query}'
+            endpoint = f'{prefix}{quote(search_term.replace(" ", "_"))}'
             possible_disambiguity = True
-        req = requests.get(endpoint)
-        soup = BeautifulSoup(req.text, 'html.parser')
+        req = await self._fetcher.get(endpoint)
+        tree = parse_html(req.text)
         if possible_disambiguity == False:
-            summary = self._scrape_treccani(soup)
+            summary = self._scrape_treccani(tree)
             if summary is not None:
-                summary = summary.text.strip()
+                summary = summary.text_content().strip()
                 return ScrapeReply(language="it", disambiguous=False, data=summary)
         else:
-            if 'www.treccani' in text:
-                text = text.replace('https://www.treccani.it/vocabolario/ricerca/', '')
-                text = text.replace('/', '')
-            else:
-                text = ' '.join(word for word in text)
-            h2 = soup.find_all('h2', {'class': 'search_preview-title'})
+            h2 = _SEARCH_TITLES(tree)
             i = 0
             for h in h2:
-                h = "".join(c for c in h.text.strip() if unicodedata.category(c) not in ["No", "Lo"])
-                h = ''.join(c for c in normalize('NFD', h) if category(c) != 'Mn')
-                if (text in h or text == h):
+                if search_term in _normalize(h.text_content().strip()):
                     i = i+1
             if i == 1:
                 prefix = f'https://www.treccani.it/vocabolario/'
-                if len(text.split()) > 1:
-                    text = text.replace(" ", "-") + ('_%28Neologismi%29/')
-                endpoint = f'{prefix}{text}'
-                req = requests.get(endpoint)
-                soup = BeautifulSoup(req.text, 'html.parser')
+                page = quote(search_term)
+                if " " in search_term:
+                    page = quote(search_term.replace(" ", "-")) + ('_%28Neologismi%29/')
+                endpoint = f'{prefix}{page}'
+                req = await self._fetcher.get(endpoint)
+                tree = parse_html(req.text)
                 if req.status_code != 200:
                     raise GRPCError(status=Status.NOT_FOUND, message="Page not found")
-                summary = self._scrape_treccani(soup)
-                summary = summary.text.strip()
+                summary = self._scrape_treccani(tree)
+                summary = summary.text_content().strip()
                 return ScrapeReply(language="it", disambiguous=False, data=summary)
             elif i == 0:
                 raise GRPCError(status=Status.NOT_FOUND, message="Page not found")
             else:
-                disambiguous_link = self._disambiguity_page(text, soup)
+                disambiguous_link = self._disambiguity_page(search_term, tree)
                 return ScrapeReply(language="it", disambiguous=True, disambiguous_data=disambiguous_link)
 
     async def long_search(self, text: str) -> ScrapeReply:
@@ -3,8 +3,9 @@ from grpclib import GRPCError
 from grpclib.const import Status
 import pytest
 
+from common.http import Page
 from definitions.scraper import ScrapeReply
-from .. import ScraperTreccani
+from .. import ScraperTreccani, _normalize, _remove_accents
 
 
 @pytest.fixture
@@ -86,3 +87,38 @@ async def test_search_link_failed(client: ScraperTreccani):
         
         
         
+
+
+def test_normalize():
+    """ Tests that titles lose accents, superscripts and non latin letters. """
+    assert _normalize("ciào¹") == "ciao"
+    assert _normalize("Perché") == "Perche"
+    assert _normalize("m² h₂o ½") == "m ho "
+    assert _normalize("1ª 2º") == "1 2"
+
+
+def test_remove_accents():
+    """ Tests that the search terms lose only their accents. """
+    assert _remove_accents("ciào") == "ciao"
+    assert _remove_accents("m² h₂o ½ 1ª") == "m² h₂o ½ 1ª"
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint(client: ScraperTreccani, monkeypatch):
+    """ Tests the search page requested for a word, keeping its superscripts. """
+    urls = []
+
+    async def get(url: str) -> Page:
+        urls.append(url)
+        return Page(status_code=200, text="<html></html>")
+    monkeypatch.setattr(client._fetcher, "get", get)
+    for text in ["Perché ", "m²", "nuova  parola"]:
+        try:
+            await client.search(text)
+        except GRPCError:
+            pass
+    assert urls == [
+        "https://www.treccani.it/vocabolario/ricerca/perche",
+        "https://www.treccani.it/vocabolario/ricerca/m%C2%B2",
+        "https://www.treccani.it/vocabolario/ricerca/nuova_parola",
+    ]
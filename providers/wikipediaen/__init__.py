@@ -1,15 +1,38 @@
-from definitions.scraper import ScraperBase, ScrapeReply, DisamiguousLink
-import requests
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from definitions.scraper import ScrapeReply, DisamiguousLink
+from definitions.scraper.server import StreamingScraperBase
+from common.http import Fetcher
+from common.utils import parse_html, class_xpath
+from lxml import etree
+from lxml.html import HtmlElement
 import re
+from typing import List, Tuple, Union
+from urllib.parse import quote
 from grpclib.exceptions import GRPCError
 from grpclib.const import Status
+from config import PARSE_WORKERS
 
+_RE_BRACKETS = re.compile(r"\s?[\(\[].*?[\)\]]")
+_ARTICLE = class_xpath('div', 'mw-parser-output')
+_SEE_ALSO = etree.XPath("boolean(.//span[@id='See_also'])")
 
-class ScraperWikipediaEN(ScraperBase):
 
-    def _clean(self, text: str) -> str:
+class ScraperWikipediaEN(StreamingScraperBase):
+
+    def __init__(self):
+        self._fetcher = Fetcher()
+        self._pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+
+    async def close(self):
+        """Function used to close the http client and the parsing processes of the scraper"""
+        await self._fetcher.close()
+        # Waiting the parsing processes to exit would block the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self._pool.shutdown)
+
+    @staticmethod
+    def _clean(text: str) -> str:
         """Function used to clean the string.
 
         Args:
@@ -18,50 +41,44 @@ class ScraperWikipediaEN(ScraperBase):
         Returns:
             str: The cleaned string
             """
-        cleanstring = text
-        cleanstring = re.sub('[A-Z]{1}?<=\.', '', cleanstring)
-        cleanstring = re.sub('\.?=[A-Z]', '', cleanstring)
-        cleanstring = re.sub('\[\d+\]', '', cleanstring)
-        cleanstring = re.sub("\s?[\(\[].*?[\)\]]", "", text)
-        cleanstring.replace(" .", ".")
-        cleanstring.replace(" ,", ".")
-        cleanstring = re.sub("\)", "", cleanstring)
+        cleanstring = _RE_BRACKETS.sub("", text)
+        cleanstring = cleanstring.replace(" .", ".")
+        cleanstring = cleanstring.replace(" ,", ",")
+        cleanstring = cleanstring.replace(")", "")
         return cleanstring
 
-    def _get_may_refer_to_list(self, soup: BeautifulSoup) -> list:
+    @staticmethod
+    def _get_may_refer_to_list(total: HtmlElement) -> List[Tuple[str, str]]:
         """Function that manages the disambiguity pages
 
         Args:
-            soup (BeautifulSoup): Parse tree used for analize the page
+            total (HtmlElement): The body of the article
             
         Returns:
-            list: The list of disambiguity
+            List[Tuple[str, str]]: The list of disambiguity, as (label, url) pairs
             """
         invalid_identifier = "action=edit"
-        total = soup.find('div', {'class': 'mw-parser-output'})
         absolute_url = 'https://en.wikipedia.org'
-        final_map = {}
         final_list = []
-        for item in total.childGenerator():
-            if item.name == "h2" and item.find('span', attrs={"id": ["See_also"]}):
+        for item in total.iterchildren():
+            if item.tag == "h2" and _SEE_ALSO(item):
                 break
-            if item.name == "ul":
-                li = item.find_all('li')
-                for l in li:
-                    child = l.find("a")
-                    if child is not None and not ((child.has_attr('class') and child['class'][0] == 'mw-disambig') or
-                            ('wiktionary' in child['href'] and child['href'] is not None) or
-                            child.has_attr('class') and child['class'][0] == 'mw-redirect'):
-                        url = (absolute_url + child.get('href')) 
+            if item.tag == "ul":
+                for l in item.iter('li'):
+                    child = l.find(".//a")
+                    if child is None or child.get('href') is None:
+                        continue
+                    classes = child.get('class', '').split()
+                    if not ((classes and classes[0] in ('mw-disambig', 'mw-redirect')) or 'wiktionary' in child.get('href')):
+                        url = (absolute_url + child.get('href'))
                         if invalid_identifier not in url:
-                            final_map = DisamiguousLink(label=l.text, url=url)
-                            final_list.append(final_map)
+                            final_list.append((l.text_content(), url))
         if len(final_list) == 0:
             raise GRPCError(status=Status.NOT_FOUND, message="Text not found")
         return final_list
 
-    def _create_soup(self, text: str) -> BeautifulSoup:
-        """Function that creates the soup
+    async def _fetch(self, text: str) -> str:
+        """Function that downloads the page of the article
 
         Args:
             text(str): the input string
@@ -70,40 +87,39 @@ class ScraperWikipediaEN(ScraperBase):
             GRPCError: An exception to communicate the result not found error
             
         Returns:
-            BeautifulSoup: The parse tree
+            str: The html of the page
             """
         if 'en.wikipedia.org' in text:
             endpoint = text
         else:
-            text = text.strip().lower().split()
             prefix = f'https://en.wikipedia.org/wiki/'
-            query = "_".join(text)
-            processed_query = '_'.join(query.split())
-            endpoint = f'{prefix}{processed_query}'
-        req = requests.get(endpoint)
+            endpoint = f'{prefix}{quote("_".join(text.lower().split()))}'
+        req = await self._fetcher.get(endpoint)
         if req.status_code != 200:
             raise GRPCError(status=Status.NOT_FOUND, message="Text not found")
-        soup = BeautifulSoup(req.text, 'html.parser')
-        return soup
+        return req.text
 
-    def _get_summary(self, soup: BeautifulSoup) -> str:
+    @staticmethod
+    def _get_summary(total: HtmlElement) -> str:
         """Commodity function used to obtain the summary
 
         Args:
-            soup(BeautifulSoup): Parse tree used for analize the page
+            total (HtmlElement): The body of the article
             
         Returns:
             str: the summary(first paragraph)
             """
-        first_paragraph = soup.find('div', {'class': 'mw-parser-output'}).find_all('p', limit=5, recursive=False)
+        first_paragraph = total.findall('p')[:5]
         summary = None
         for p in first_paragraph:
-            if len(p.text) > 5:
-                summary = self._clean(p.text)
+            p_text = p.text_content()
+            if len(p_text) > 5:
+                summary = ScraperWikipediaEN._clean(p_text)
                 break
         return summary
 
-    def _is_disambiguous(self, summary: str) -> bool:
+    @staticmethod
+    def _is_disambiguous(summary: str) -> bool:
         """Function used to chech if the page is a disasambiguity page
 
         Args:
@@ -115,6 +131,35 @@ class ScraperWikipediaEN(ScraperBase):
         disambiguous_phrase = 'may refer to'
         return disambiguous_phrase in summary
 
+    async def _extract(self, text: str, long: bool) -> ScrapeReply:
+        """Function that downloads the article and extracts the reply out of the event loop
+
+        Args:
+            text(str): the input string
+            long(bool): True to extract the whole article instead of the summary
+            
+        Raises:
+            GRPCError: An exception to communicate the result not found error
+            
+        Returns:
+            ScrapeReply: The response of the service
+            """
+        body = await self._fetch(text)
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            disambiguous, data = await loop.run_in_executor(pool, _extract_wiki, body, long)
+        except BrokenProcessPool:
+            # A parsing process died, so the pool is replaced and the page parsed again
+            if self._pool is pool:
+                pool.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+            disambiguous, data = await loop.run_in_executor(self._pool, _extract_wiki, body, long)
+        if disambiguous:
+            disambiguouslink = [DisamiguousLink(label=label, url=url) for label, url in data]
+            return ScrapeReply(language="en", disambiguous=True, disambiguous_data=disambiguouslink)
+        return ScrapeReply(language="en", disambiguous=False, data=data)
+
     async def search(self, text: str) -> ScrapeReply:
         """The function for the short search
 
@@ -127,15 +172,7 @@ class ScraperWikipediaEN(ScraperBase):
         Returns:
             ScrapeReply: The response of the service
             """
-        soup = self._create_soup(text)
-        summary = self._get_summary(soup)
-        if summary is None:
-            raise GRPCError(status=Status.NOT_FOUND, message="Summary not found")
-
-        if self._is_disambiguous(summary):
-            disambiguouslink = self._get_may_refer_to_list(soup)
-            return ScrapeReply(language="en", disambiguous=True, disambiguous_data=disambiguouslink)
-        return ScrapeReply(language="en", disambiguous=False, data=summary)
+        return await self._extract(text, False)
 
     async def long_search(self, text: str) -> ScrapeReply:
         """The function for the long search
@@ -149,20 +186,40 @@ class ScraperWikipediaEN(ScraperBase):
         Returns:
             ScrapeReply: The response of the service
             """
-        soup = self._create_soup(text)
-        summary = self._get_summary(soup)
-        if summary is None:
-            raise GRPCError(status=Status.NOT_FOUND, message="Summary not found")
-
-        if self._is_disambiguous(summary):
-            disambiguouslink = self._get_may_refer_to_list(soup)
-            return ScrapeReply(language="en", disambiguous=True, disambiguous_data=disambiguouslink)
-        total = soup.find('div', {'class': 'mw-parser-output'})
-        result = ""
-        for t in total.childGenerator():
-            if t.name == "h2" and t.find('span', attrs={"id": ["See_also"]}):
-                break
-            if t.name in ["p", "h2", "h3", "ul", "h4"]:
-                result += t.get_text() + "\n\n"
-        data = self._clean(result)
-        return ScrapeReply(language="en", disambiguous=False, data=data)
+        return await self._extract(text, True)
+
+
+def _extract_wiki(body: str, long: bool) -> Tuple[bool, Union[str, List[Tuple[str, str]]]]:
+    """Function that parses the page of the article and extracts its content.
+    It runs in the parsing processes of the scraper, so it returns only plain data.
+
+    Args:
+        body(str): the html of the page
+        long(bool): True to extract the whole article instead of the summary
+
+    Raises:
+        GRPCError: An exception to communicate the result not found error
+
+    Returns:
+        Tuple[bool, Union[str, List[Tuple[str, str]]]]: The disambiguity of the page,
+        followed by the (label, url) pairs of the disambiguity or by the text of the article
+        """
+    article = _ARTICLE(parse_html(body))
+    if len(article) == 0:
+        raise GRPCError(status=Status.NOT_FOUND, message="Text not found")
+    total = article[0]
+    summary = ScraperWikipediaEN._get_summary(total)
+    if summary is None:
+        raise GRPCError(status=Status.NOT_FOUND, message="Summary not found")
+
+    if ScraperWikipediaEN._is_disambiguous(summary):
+        return True, ScraperWikipediaEN._get_may_refer_to_list(total)
+    if not long:
+        return False, summary
+    parts = []
+    for t in total.iterchildren():
+        if t.tag == "h2" and _SEE_ALSO(t):
+            break
+        if t.tag in ("p", "h2", "h3", "ul", "h4"):
+            parts.append(t.text_content())
+    return False, ScraperWikipediaEN._clean("\n\n".join(parts))
@@ -1,4 +1,5 @@
 import asyncio
+import os
 from grpclib import GRPCError
 from grpclib.const import Status
 import pytest
@@ -8,8 +9,10 @@ from .. import ScraperWikipediaEN
 
 
 @pytest.fixture
-def client():
-    return ScraperWikipediaEN()
+async def client():
+    client = ScraperWikipediaEN()
+    yield client
+    await client.close()
 
 
 @pytest.mark.asyncio
@@ -86,3 +89,27 @@ async def test_search_link_failed(client: ScraperWikipediaEN):
         assert excinfo.value.status == Status.NOT_FOUND
         
         
+
+
+@pytest.mark.asyncio
+async def test_parsing_process_died(client: ScraperWikipediaEN, monkeypatch):
+    """ Tests that a search still succeeds after a parsing process died. """
+    async def fetch(text: str) -> str:
+        return '<div class="mw-parser-output"><p>Hello is a salutation or greeting.</p></div>'
+    monkeypatch.setattr(client, "_fetch", fetch)
+    assert (await client.search("hello")).data == "Hello is a salutation or greeting."
+
+    # A worker exiting abruptly breaks the whole pool
+    broken = client._pool
+    with pytest.raises(Exception):
+        await asyncio.wrap_future(broken.submit(os._exit, 1))
+    res = await client.search("hello")
+    assert res.data == "Hello is a salutation or greeting."
+    assert client._pool is not broken
+
+
+def test_clean(client: ScraperWikipediaEN):
+    """ Tests the cleaning of the brackets and of the spaces before the punctuation. """
+    assert client._clean("Hello (in English) [1] is a greeting .") == "Hello is a greeting."
+    assert client._clean("one , two ,three") == "one, two,three"
+    assert client._clean("a [citation needed]word)") == "aword"
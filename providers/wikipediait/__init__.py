@@ -1,15 +1,24 @@
-from definitions.scraper import ScraperBase, ScrapeReply, DisamiguousLink
+from definitions.scraper import ScrapeReply, DisamiguousLink
+from definitions.scraper.server import StreamingScraperBase
 import logging
-import requests
-import requests
+from common.http import Fetcher
 from bs4 import BeautifulSoup
-from requests.exceptions import RequestException
 import re
+from urllib.parse import quote
 from grpclib.exceptions import GRPCError
 from grpclib.const import Status
 
+_RE_BRACKETS = re.compile(r"\s?[\(\[].*?[\)\]]")
 
-class ScraperWikipediaIT(ScraperBase):
+
+class ScraperWikipediaIT(StreamingScraperBase):
+
+    def __init__(self):
+        self._fetcher = Fetcher()
+
+    async def close(self):
+        """Function used to close the http client of the scraper"""
+        await self._fetcher.close()
 
     def _clean(self, text: str) -> str:
         """Function used to clean the string.
@@ -20,14 +29,10 @@ class ScraperWikipediaIT(ScraperBase):
         Returns:
             str: The cleaned string
             """
-        cleanstring = text
-        cleanstring = re.sub('[A-Z]{1}?<=\.', '', cleanstring)
-        cleanstring = re.sub('\.?=[A-Z]', '', cleanstring)
-        cleanstring = re.sub('\[\d+\]', '', cleanstring)
-        cleanstring = re.sub("\s?[\(\[].*?[\)\]]", "", text)
-        cleanstring.replace(" .", ".")
-        cleanstring.replace(" ,", ".")
-        cleanstring = re.sub("\)", "", cleanstring)
+        cleanstring = _RE_BRACKETS.sub("", text)
+        cleanstring = cleanstring.replace(" .", ".")
+        cleanstring = cleanstring.replace(" ,", ",")
+        cleanstring = cleanstring.replace(")", "")
         return cleanstring
 
     def _get_may_refer_to_list(self, soup: BeautifulSoup) -> list:
@@ -73,7 +78,7 @@ class ScraperWikipediaIT(ScraperBase):
                 break
         return self._clean(summary)
 
-    def _create_soup(self, text: str) -> BeautifulSoup:
+    async def _create_soup(self, text: str) -> BeautifulSoup:
         """Function that creates the soup
 
         Args:
@@ -88,17 +93,14 @@ class ScraperWikipediaIT(ScraperBase):
         if 'it.wikipedia.org' in text:
             endpoint = text
         else:
-            text = text.strip().lower().split()
             prefix = f'https://it.wikipedia.org/wiki/'
-            query = "_".join(text)
-            processed_query = '_'.join(query.split())
-            endpoint = f'{prefix}{processed_query}'
-        req = requests.get(endpoint)
+            endpoint = f'{prefix}{quote("_".join(text.lower().split()))}'
+        req = await self._fetcher.get(endpoint)
 
         if req.status_code != 200:
             raise GRPCError(status=Status.NOT_FOUND, message="Text not found")
 
-        soup = BeautifulSoup(req.text, 'html.parser')
+        soup = BeautifulSoup(req.text, 'lxml')
         return soup
 
     def _is_disambiguous(self, soup: BeautifulSoup) -> bool:
@@ -125,7 +127,7 @@ class ScraperWikipediaIT(ScraperBase):
         Returns:
             ScrapeReply: The response of the service
             """
-        soup = self._create_soup(text)
+        soup = await self._create_soup(text)
         if self._is_disambiguous(soup):
             disambiguous_link = self._get_may_refer_to_list(soup)
             return ScrapeReply(language="it", disambiguous=True, disambiguous_data=disambiguous_link)
@@ -143,17 +145,17 @@ class ScraperWikipediaIT(ScraperBase):
         Returns:
             ScrapeReply: The response of the service
             """
-        soup = self._create_soup(text)
+        soup = await self._create_soup(text)
         if self._is_disambiguous(soup):
             disambiguous_link = self._get_may_refer_to_list(soup)
             return ScrapeReply(language="it", disambiguous=True, disambiguous_data=disambiguous_link)
         
         total = soup.find('div', {'class': 'mw-parser-output'})
-        result = ""
+        parts = []
         for t in total.childGenerator():
             if t.name == "h2" and t.find('span', attrs={"id": ["Note"]}):
                 break
-            if t.name in ["p", "h2", "h3", "ul"]:
-                result += t.get_text() + "\n\n"
-        data = self._clean(result)
+            if t.name in ("p", "h2", "h3", "ul"):
+                parts.append(t.get_text())
+        data = self._clean("\n\n".join(parts))
         return ScrapeReply(language="it", disambiguous=False, data=data)
@@ -83,4 +83,11 @@ async def test_search_link_failed(client: ScraperWikipediaIT):
         with pytest.raises(GRPCError) as excinfo:
             await req("https://it.wikipedia.org/wiki/fhjashd")
 
-        assert excinfo.value.status == Status.NOT_FOUND
\ No newline at end of file
+        assert excinfo.value.status == Status.NOT_FOUND
+
+
+def test_clean(client: ScraperWikipediaIT):
+    """ Tests the cleaning of the brackets and of the spaces before the punctuation. """
+    assert client._clean("Hello (in English) [1] is a greeting .") == "Hello is a greeting."
+    assert client._clean("one , two ,three") == "one, two,three"
+    assert client._clean("a [citation needed]word)") == "aword"
@@ -1,6 +1,7 @@
-from typing import List
+from typing import Any, Dict, List
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timezone
+import orjson
 
 
 class DisambiguousLinkResponse(BaseModel):
@@ -19,3 +20,16 @@ class SuccessResponse(BaseModel):
 class ConflictResponse(BaseModel):
     data: List[DisambiguousLinkResponse]
     provider: str
+
+
+def encode_success(result: Dict[str, Any]) -> bytes:
+    """Function used to serialize a search result as the json of SuccessResponse
+
+    Args:
+        result (Dict[str, Any]): The search result, with created_at in milliseconds since the epoch
+
+    Returns:
+        bytes: The serialized json
+    """
+    created_at = datetime.fromtimestamp(result["created_at"] / 1000, tz=timezone.utc)
+    return orjson.dumps({**result, "created_at": created_at})
@@ -0,0 +1,97 @@
+import asyncio
+from grpclib import GRPCError
+from grpclib.const import Status
+import pytest
+
+from definitions.scraper import ScrapeReply
+from config import DEFAULT_MAX_AGE
+from main import _first_by_priority, _parse_cache_control, _search_stub
+
+
+class FakeStub:
+    def __init__(self, data=None, delay=0.0):
+        self.data = data
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+
+    async def search(self, *, text: str = "") -> ScrapeReply:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.data is None:
+            raise GRPCError(Status.NOT_FOUND, "Text not found")
+        return ScrapeReply(language="en", data=self.data)
+
+    long_search = search
+
+
+def launch(q: str, stubs):
+    return [asyncio.create_task(_search_stub(p, stub, q, False), name=p) for p, stub in stubs]
+
+
+@pytest.mark.asyncio
+async def test_priority_higher_wins():
+    """ Tests that the result of a provider with higher priority is preferred even when slower. """
+    first, second = FakeStub("first", delay=0.05), FakeStub("second")
+    provider, result = await _first_by_priority(launch("priority higher", [("first", first), ("second", second)]))
+    assert provider == "first"
+    assert result["data"] == "first"
+
+
+@pytest.mark.asyncio
+async def test_priority_fallback():
+    """ Tests that the result of a provider is accepted once the providers with higher priority failed. """
+    first, second = FakeStub(None, delay=0.05), FakeStub("second")
+    provider, result = await _first_by_priority(launch("priority fallback", [("first", first), ("second", second)]))
+    assert provider == "second"
+    assert result["data"] == "second"
+
+
+@pytest.mark.asyncio
+async def test_priority_all_failed():
+    """ Tests that no result is returned when all the providers failed. """
+    stubs = [("first", FakeStub(None)), ("second", FakeStub(None, delay=0.01))]
+    assert await _first_by_priority(launch("priority failed", stubs)) == (None, None)
+
+
+@pytest.mark.asyncio
+async def test_priority_cancel_rest():
+    """ Tests that the searches still running are cancelled once a result is accepted. """
+    first, second = FakeStub("first"), FakeStub("second", delay=10)
+    provider, _ = await _first_by_priority(launch("priority cancel", [("first", first), ("second", second)]))
+    await asyncio.sleep(0.01)
+    assert provider == "first"
+    assert second.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_search_after_cancel():
+    """ Tests that an identical search arriving right after a cancelled one gets its own result. """
+    stub = FakeStub("result", delay=0.05)
+    dropped = asyncio.create_task(_search_stub("provider", stub, "after cancel", False))
+    await asyncio.sleep(0.01)
+    dropped.cancel()
+    # The dropped search handles its cancellation, while the shared call is still finishing
+    await asyncio.sleep(0)
+    result = await _search_stub("provider", stub, "after cancel", False)
+    assert result["data"] == "result"
+    assert stub.calls == 2
+
+
+def test_parse_cache_control():
+    """ Tests the maximum age parsed from the cache-control header. """
+    assert _parse_cache_control(None) == DEFAULT_MAX_AGE
+    assert _parse_cache_control("no-cache") is None
+    assert _parse_cache_control("max-age=10") == 10
+    assert _parse_cache_control("max-age=0") == 0
+    assert _parse_cache_control("max-age=ten") == DEFAULT_MAX_AGE
+    assert _parse_cache_control("private") == DEFAULT_MAX_AGE
+    assert _parse_cache_control("no-store") is None
+    assert _parse_cache_control("max-age=0, no-cache") is None
+    assert _parse_cache_control("no-cache, max-age=10") is None
+    assert _parse_cache_control("private, max-age=10") == 10
+    assert _parse_cache_control("  Max-Age = 10 ,public") == 10
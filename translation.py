@@ -1,7 +1,8 @@
 from typing import List, Dict, Any
+from functools import lru_cache
 from googletrans import Translator
 import httpx
-from config import TRANSLATE_TIMEOUT
+from config import TRANSLATE_TIMEOUT, TRANSLATION_CACHE_SIZE
 from log_config import init_logger
 import logging
 
@@ -38,6 +39,27 @@ def chunkize(long_text: str, characters=1024, sep=".") -> List[str]:
     return chunks
 
 
+@lru_cache(maxsize=TRANSLATION_CACHE_SIZE)
+def _translate_text(text: str, src: str, dest: str) -> str:
+    """Function used to translate a text, chunk by chunk.
+    The translations are cached, so the same text is translated only once for each pair of languages.
+    Failed translations raise and are not cached.
+
+    Args:
+        text (str): The text to translate
+        src (str): The language of the text
+        dest (str): The target language
+
+    Returns:
+        str: The translated text
+    """
+    translated_chunks = []
+    for chunk in chunkize(text):
+        translated = _t.translate(chunk, dest=dest, src=src).text
+        translated_chunks.append(translated)
+    return "".join(translated_chunks)
+
+
 def translate(content: Dict[str, Any], lang: str) -> Dict[str, Any]:
     """Translate function that translates content to a desired language.
     The text to be translated must be in content['data']
@@ -55,15 +77,11 @@ def translate(content: Dict[str, Any], lang: str) -> Dict[str, Any]:
     logger.info(f"TRANSLATION FROM {current} TO {requested}")
 
     if current != requested:
-        chunks = chunkize(content["data"])
         try:
-            translated_chunks = []
-            for chunk in chunks:
-                translated = _t.translate(chunk, dest=requested, src=current).text
-                translated_chunks.append(translated)
+            translated = _translate_text(content["data"], current, requested)
             content = content.copy()
             content['current_language'] = requested
-            content["data"] = "".join(translated_chunks)
+            content["data"] = translated
         except Exception as e:
             logger.error(e)
         finally: